@@ -6,12 +6,143 @@ Considers both tweet content and date for duplicate verification
 
 import re
 import json
-import hashlib
+from bisect import bisect_right
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from functools import cached_property
 from typing import List, Dict, Tuple, Set
 from difflib import SequenceMatcher
 import argparse
 import os
+import zlib
+
+try:
+    from rapidfuzz import process
+    from rapidfuzz.distance import Indel
+except ImportError:
+    # Fall back to difflib when rapidfuzz is not installed
+    Indel = process = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    # Without numba the MinHash kernels below run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+    prange = range
+
+# Rows of the similarity matrix scored per cdist call (bounds memory to chunk * n)
+CDIST_CHUNK_ROWS = 1024
+
+# Most pairwise scores kept for reuse by repeated content (least recently used evicted)
+SIMILARITY_CACHE_SIZE = 1 << 20
+
+# MinHash parameters: signature width, shingle size and the Mersenne prime 2**61 - 1
+MINHASH_PERMUTATIONS = 128
+SHINGLE_SIZE = 5
+
+# LSH banding of the signature: 32 bands of 4 slots reliably catch pairs above ~0.42
+# shingle Jaccard; short tweets a few edits apart can fall below that and be missed
+LSH_BANDS = 32
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+_MERSENNE_PRIME = (1 << 61) - 1
+
+# Patterns compiled once for the per-tweet parsing in Tweet
+_MENTION_RE = re.compile(r'@\w+')
+_URL_RE = re.compile(r'https?://\S+')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+# Arabic letter variants folded together before comparison; seven str.replace calls
+# beat str.translate, whose non-ASCII table is looked up per character
+_ARABIC_NORM_PAIRS = (
+    ('أ', 'ا'), ('إ', 'ا'), ('آ', 'ا'),
+    ('ة', 'ه'), ('ى', 'ي'),
+    ('ئ', 'ي'), ('ؤ', 'و'),
+)
+
+
+@njit(cache=True)
+def _signature_agreement(sigs, i, j):
+    """Count the MinHash slots on which two signatures agree."""
+    agree = 0
+    for k in range(sigs.shape[1]):
+        if sigs[i, k] == sigs[j, k]:
+            agree += 1
+    return agree
+
+
+@njit(parallel=True, cache=True)
+def _minhash_match_counts(sigs, valid, window_end, min_agree):
+    """Count, per row, the later rows inside its date window that match it."""
+    n = sigs.shape[0]
+    counts = np.zeros(n, dtype=np.int64)
+    for i in prange(n):
+        if not valid[i]:
+            continue
+        found = 0
+        for j in range(i + 1, window_end[i]):
+            if valid[j] and _signature_agreement(sigs, i, j) >= min_agree:
+                found += 1
+        counts[i] = found
+    return counts
+
+
+@njit(parallel=True, cache=True)
+def _minhash_fill_pairs(sigs, valid, window_end, min_agree, offsets, pairs):
+    """Write matching (i, j) rows into pairs, starting at each row's offset."""
+    n = sigs.shape[0]
+    for i in prange(n):
+        if not valid[i]:
+            continue
+        pos = offsets[i]
+        for j in range(i + 1, window_end[i]):
+            if valid[j] and _signature_agreement(sigs, i, j) >= min_agree:
+                pairs[pos, 0] = i
+                pairs[pos, 1] = j
+                pos += 1
+
+
+@njit(cache=True)
+def _find_root(parent, i):
+    """Find the root of i, compressing the path behind it."""
+    root = i
+    while parent[root] != root:
+        root = parent[root]
+    while parent[i] != root:
+        nxt = parent[i]
+        parent[i] = root
+        i = nxt
+    return root
+
+
+@njit(cache=True)
+def _union_find_roots(n, pairs):
+    """Union every pair and return the root of each element."""
+    parent = np.arange(n).astype(np.int32)
+    for k in range(pairs.shape[0]):
+        a = _find_root(parent, pairs[k, 0])
+        b = _find_root(parent, pairs[k, 1])
+        if a < b:
+            parent[b] = a
+        elif b < a:
+            parent[a] = b
+    for i in range(n):
+        parent[i] = _find_root(parent, i)
+    return parent
 
 
 class Tweet:
@@ -23,7 +154,6 @@ class Tweet:
         self.reply_to = self._extract_reply_to(content) if not reply_to else reply_to
         self.content = self._normalize_content(content)
         self.urls = urls or []
-        self.signature = self._generate_signature()
         
     def _parse_date(self, date_str: str) -> datetime:
         """Parse date string to datetime object."""
@@ -44,68 +174,121 @@ class Tweet:
         if not content:
             return ""
         
-        # Find @username patterns at the beginning of the content (most likely replies)
-        match = re.match(r'^(@\w+(?:\s+@\w+)*)\s*', content.strip())
-        if match:
-            usernames = re.findall(r'@\w+', match.group(1))
-            return ', '.join(usernames)
+        # One scan for every @username; a leading run of them marks a reply
+        content = content.strip()
+        mentions = list(_MENTION_RE.finditer(content))
+        if not mentions:
+            return ""
         
-        # Check for @username patterns anywhere in the content
-        usernames = re.findall(r'@\w+', content)
-        if usernames:
-            return ', '.join(set(usernames))  # Remove duplicates
+        if mentions[0].start() == 0:
+            usernames = [mentions[0].group()]
+            end = mentions[0].end()
+            for mention in mentions[1:]:
+                # The run ends at the first gap that is not pure whitespace
+                if not content[end:mention.start()].isspace():
+                    break
+                usernames.append(mention.group())
+                end = mention.end()
+            return ', '.join(usernames)
         
-        return ""
+        # Mentions anywhere in the content, duplicates removed in order of appearance
+        return ', '.join(dict.fromkeys(mention.group() for mention in mentions))
 
     def _normalize_content(self, content: str) -> str:
         """Normalize tweet content for better comparison."""
         if not content:
             return ""
         
-        # Remove extra whitespace
-        content = re.sub(r'\s+', ' ', content.strip())
-        
         # Normalize Arabic characters
-        arabic_norm_map = {
-            'أ': 'ا', 'إ': 'ا', 'آ': 'ا',
-            'ة': 'ه', 'ى': 'ي',
-            'ئ': 'ي', 'ؤ': 'و'
-        }
-        
-        for original, normalized in arabic_norm_map.items():
+        for original, normalized in _ARABIC_NORM_PAIRS:
             content = content.replace(original, normalized)
         
         # Remove URLs for content comparison
-        content = re.sub(r'https?://\S+', '', content)
+        content = _URL_RE.sub('', content)
         
         # Remove @username patterns from content for comparison (but keep them in reply_to)
-        content = re.sub(r'@\w+', '', content)
-        
-        # Clean up extra spaces
-        content = re.sub(r'\s+', ' ', content).strip()
+        content = _MENTION_RE.sub('', content)
         
-        return content
+        # Collapse whitespace left behind
+        return _WHITESPACE_RE.sub(' ', content).strip()
     
-    def _generate_signature(self) -> str:
-        """Generate a unique signature for this tweet."""
-        # Create a normalized signature for exact matching
-        normalized = f"{self.date.strftime('%Y-%m-%d')}_{self.content}"
-        return hashlib.md5(normalized.encode('utf-8')).hexdigest()
+    @cached_property
+    def signature(self) -> Tuple[datetime, str]:
+        """Unique signature for this tweet, computed on first use."""
+        # Timestamp plus the content itself, so equal signatures always mean equal tweets;
+        # the str hash is cached, so dict lookups cost no more than hashing an int
+        return (self.date, self.content)
     
-    def get_content_hash(self) -> str:
+    @cached_property
+    def shingles(self) -> frozenset:
+        """Character shingles of the normalized content, computed on first use."""
+        content = self.content
+        if not content:
+            return frozenset()
+        # Content shorter than one shingle becomes a single shingle
+        return frozenset(content[k:k + SHINGLE_SIZE]
+                         for k in range(max(1, len(content) - SHINGLE_SIZE + 1)))
+    
+    def get_content_hash(self) -> int:
         """Get hash of normalized content only."""
-        return hashlib.md5(self.content.encode('utf-8')).hexdigest()
+        return hash(self.content)
     
     def __str__(self):
         return f"{self.date.strftime('%Y-%m-%d %H:%M')} - {self.content[:50]}..."
 
 
+class UnionFind:
+    """Disjoint-set forest with path compression and union by rank."""
+    
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.rank = [0] * size
+        
+    def find(self, i: int) -> int:
+        """Return the root of i, pointing every node on the way straight at it."""
+        parent = self.parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+    
+    def union(self, a: int, b: int) -> bool:
+        """Merge the sets holding a and b; return False if they were already joined."""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+            
+        if self.rank[root_a] < self.rank[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        if self.rank[root_a] == self.rank[root_b]:
+            self.rank[root_a] += 1
+        return True
+    
+    def groups(self) -> List[List[int]]:
+        """Return every set with more than one member, ordered by smallest member."""
+        members = defaultdict(list)
+        for i in range(len(self.parent)):
+            members[self.find(i)].append(i)
+        return [group for group in members.values() if len(group) > 1]
+
+
 class DuplicateDetector:
     """Enhanced duplicate detection with fuzzy matching and date proximity."""
     
-    def __init__(self, content_threshold: float = 0.85, date_window_hours: int = 24):
+    def __init__(self, content_threshold: float = 0.85, date_window_hours: int = 24,
+                 use_minhash: bool = False, use_lsh: bool = False,
+                 shingle_threshold: float = None, workers: int = 1):
         self.content_threshold = content_threshold
         self.date_window = timedelta(hours=date_window_hours)
+        self.use_minhash = use_minhash
+        self.use_lsh = use_lsh
+        # Optional shingle-Jaccard floor a pair must clear before the edit ratio is computed
+        self.shingle_threshold = shingle_threshold
+        # Processes for the pure-Python pairwise scorer (-1 uses every core)
+        self.workers = workers
         self.tweets = []
         self.duplicate_groups = []
         
@@ -116,54 +299,50 @@ class DuplicateDetector:
         
         try:
             with open(filename, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                
-            for line in lines:
-                line = line.strip()
-                
-                if line.startswith("Date:"):
-                    if current_tweet and 'content' in current_tweet:
-                        tweets.append(Tweet(
-                            current_tweet.get('date', ''),
-                            current_tweet.get('content', ''),
-                            current_tweet.get('reply_to', ''),
-                            current_tweet.get('urls', [])
-                        ))
-                    current_tweet = {'date': line[6:].strip()}
-                    
-                elif line.startswith("REPLY TO:"):
-                    current_tweet['reply_to'] = line[10:].strip()
+                for raw in f:
+                    line = raw.strip()
                     
-                elif line == "CONTENT:":
-                    # Collect content until next separator
-                    content_lines = []
-                    continue
-                    
-                elif line.startswith("URLS:"):
-                    # Skip URLS section for now
-                    continue
-                    
-                elif line.startswith("http") and 'urls' not in current_tweet:
-                    if 'urls' not in current_tweet:
-                        current_tweet['urls'] = []
-                    current_tweet['urls'].append(line)
-                    
-                elif line.startswith("- http"):
-                    if 'urls' not in current_tweet:
-                        current_tweet['urls'] = []
-                    current_tweet['urls'].append(line[2:])
-                    
-                elif line and '=' not in line and 'TWEET' not in line and 'Archive' not in line:
-                    if 'content' not in current_tweet:
-                        current_tweet['content'] = line
-                    else:
-                        current_tweet['content'] += ' ' + line
+                    if line.startswith("Date:"):
+                        if current_tweet and 'content_parts' in current_tweet:
+                            tweets.append(Tweet(
+                                current_tweet.get('date', ''),
+                                ' '.join(current_tweet['content_parts']),
+                                current_tweet.get('reply_to', ''),
+                                current_tweet.get('urls', [])
+                            ))
+                        current_tweet = {'date': line[6:].strip()}
+                        
+                    elif line.startswith("REPLY TO:"):
+                        current_tweet['reply_to'] = line[10:].strip()
                         
+                    elif line == "CONTENT:":
+                        # Collect content until next separator
+                        content_lines = []
+                        continue
+                        
+                    elif line.startswith("URLS:"):
+                        # Skip URLS section for now
+                        continue
+                        
+                    elif line.startswith("http") and 'urls' not in current_tweet:
+                        if 'urls' not in current_tweet:
+                            current_tweet['urls'] = []
+                        current_tweet['urls'].append(line)
+                        
+                    elif line.startswith("- http"):
+                        if 'urls' not in current_tweet:
+                            current_tweet['urls'] = []
+                        current_tweet['urls'].append(line[2:])
+                        
+                    elif line and '=' not in line and 'TWEET' not in line and 'Archive' not in line:
+                        # Join fragments once when the tweet closes instead of growing a string
+                        current_tweet.setdefault('content_parts', []).append(line)
+                            
             # Add last tweet
-            if current_tweet and 'content' in current_tweet:
+            if current_tweet and 'content_parts' in current_tweet:
                 tweets.append(Tweet(
                     current_tweet.get('date', ''),
-                    current_tweet.get('content', ''),
+                    ' '.join(current_tweet['content_parts']),
                     current_tweet.get('reply_to', ''),
                     current_tweet.get('urls', [])
                 ))
@@ -173,58 +352,337 @@ class DuplicateDetector:
             
         return tweets
     
-    def calculate_content_similarity(self, text1: str, text2: str) -> float:
-        """Calculate similarity between two text strings."""
+    def calculate_content_similarity(self, text1: str, text2: str,
+                                     matcher: SequenceMatcher = None) -> float:
+        """Calculate similarity between two text strings.
+        
+        ``matcher`` may be a SequenceMatcher already holding ``text2`` as its
+        second sequence, letting the difflib fallback reuse its index.
+        """
         if not text1 or not text2:
             return 0.0
             
-        # Use SequenceMatcher for fuzzy string matching
-        similarity = SequenceMatcher(None, text1, text2).ratio()
-        
-        # Additional check for substring containment
-        if text1 in text2 or text2 in text1:
-            similarity = max(similarity, 0.9)
+        # The ratio can never exceed 2*min/(l1+l2), so skip pairs whose lengths rule them out
+        l1, l2 = len(text1), len(text2)
+        if 2 * min(l1, l2) / (l1 + l2) < self.content_threshold:
+            return 0.0
             
+        if Indel is not None:
+            # Bit-parallel Indel similarity in C; scores under the threshold come back as 0
+            similarity = Indel.normalized_similarity(
+                text1, text2, score_cutoff=self.content_threshold
+            )
+        else:
+            # Use SequenceMatcher for fuzzy string matching; tweets are too short for autojunk
+            if matcher is None:
+                matcher = SequenceMatcher(None, text1, text2, autojunk=False)
+            else:
+                matcher.set_seq1(text1)
+            similarity = matcher.ratio()
+        
         return similarity
     
+    def calculate_shingle_similarity(self, shingles1: frozenset, shingles2: frozenset) -> float:
+        """Calculate Jaccard similarity between two precomputed shingle sets."""
+        if not shingles1 or not shingles2:
+            return 0.0
+        shared = len(shingles1 & shingles2)
+        return shared / (len(shingles1) + len(shingles2) - shared)
+    
+    def _passes_shingle_prefilter(self, tweet1: Tweet, tweet2: Tweet) -> bool:
+        """Check a pair against the optional shingle-Jaccard prefilter."""
+        if self.shingle_threshold is None:
+            return True
+        return self.calculate_shingle_similarity(tweet1.shingles, tweet2.shingles) >= self.shingle_threshold
+    
     def are_dates_close(self, date1: datetime, date2: datetime) -> bool:
         """Check if two dates are within the configured time window."""
         return abs(date1 - date2) <= self.date_window
     
+    def _bucket_by_date(self, tweets: List[Tweet]) -> Tuple[List[int], Dict[int, List[int]]]:
+        """Assign each tweet to a date bucket one date window wide."""
+        width = max(self.date_window.total_seconds(), 1.0)
+        keys = [int(tweet.date.timestamp() // width) for tweet in tweets]
+        
+        buckets = defaultdict(list)
+        for i, key in enumerate(keys):
+            buckets[key].append(i)
+            
+        return keys, buckets
+    
+    def _timestamps(self, tweets: List[Tweet]) -> "np.ndarray":
+        """Return tweet dates as POSIX seconds in a float64 array."""
+        return np.array([tweet.date.timestamp() for tweet in tweets], dtype=np.float64)
+    
+    def _sorted_date_windows(self, tweets: List[Tweet]) -> Tuple[List[int], List[int]]:
+        """Order tweets by date and find where each one's date window ends in that order."""
+        times = [tweet.date.timestamp() for tweet in tweets]
+        order = sorted(range(len(tweets)), key=times.__getitem__)
+        sorted_times = [times[a] for a in order]
+        window = self.date_window.total_seconds()
+        
+        if np is not None:
+            sorted_arr = np.asarray(sorted_times, dtype=np.float64)
+            window_end = np.searchsorted(sorted_arr, sorted_arr + window, side='right').tolist()
+        else:
+            window_end = [bisect_right(sorted_times, t + window) for t in sorted_times]
+            
+        return order, window_end
+    
     def find_duplicates(self, tweets: List[Tweet]) -> List[List[int]]:
         """Find duplicate tweet groups based on content and date."""
-        n = len(tweets)
-        duplicates = []
-        processed = set()
+        if self.use_minhash:
+            if np is not None:
+                if self.shingle_threshold is not None:
+                    print("--shingle-threshold has no effect with MinHash, which already scores shingle Jaccard")
+                return self._find_duplicates_minhash(tweets)
+            print("MinHash detection requires numpy - using fuzzy matching instead")
+            
+        if self.use_lsh and np is None:
+            print("LSH candidate search requires numpy - comparing all date-close pairs instead")
+            
+        # Copies with the same timestamp are joined up front; only one of each goes through fuzzy matching
+        union_find = UnionFind(len(tweets))
+        unique = self._union_exact_duplicates(tweets, union_find)
         
-        for i in range(n):
-            if i in processed:
+        if self.use_lsh and np is not None:
+            self._union_similar_lsh(tweets, unique, union_find)
+        elif process is not None and np is not None:
+            self._union_similar_matrix(tweets, unique, union_find)
+        else:
+            self._union_similar_pairwise(tweets, unique, union_find)
+            
+        return union_find.groups()
+    
+    def _union_exact_duplicates(self, tweets: List[Tweet], union_find: "UnionFind") -> List[int]:
+        """Union copies posted at the same moment and return one representative index per copy set."""
+        # Only identical timestamps share a date window, so only those signatures can be
+        # left out of fuzzy matching without losing pairs through their own window
+        first_copy = {}
+        representatives = []
+        for i, tweet in enumerate(tweets):
+            if not tweet.content:
+                representatives.append(i)
                 continue
+            
+            first = first_copy.setdefault(tweet.signature, i)
+            if first == i:
+                representatives.append(i)
+            else:
+                union_find.union(first, i)
                 
-            group = [i]
+        return representatives
+    
+    def _union_similar_pairwise(self, tweets: List[Tweet], indices: List[int],
+                                union_find: "UnionFind"):
+        """Union similar tweets among indices, scoring candidate pairs one at a time."""
+        subset = [tweets[i] for i in indices]
+        
+        # In date order, every tweet's window is the run of later tweets before window_end
+        order, window_end = self._sorted_date_windows(subset)
+        
+        workers = (os.cpu_count() or 1) if self.workers == -1 else self.workers
+        if workers > 1 and len(subset) > 1:
+            # Score interleaved slices of rows in worker processes, then union here
+            slices = [range(start, len(order), workers * 4) for start in range(workers * 4)]
+            detector = DuplicateDetector(self.content_threshold, shingle_threshold=self.shingle_threshold)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_pairwise_worker,
+                                     initargs=(detector, subset, order, window_end)) as pool:
+                for pairs in pool.map(_score_pairwise_slice, slices):
+                    for a, b in pairs:
+                        union_find.union(indices[a], indices[b])
+            return
             
-            for j in range(i + 1, n):
-                if j in processed:
-                    continue
-                    
-                # Check if dates are close
-                if not self.are_dates_close(tweets[i].date, tweets[j].date):
+        # Pairs already joined through other matches need no score
+        def connected(a: int, b: int) -> bool:
+            return union_find.find(indices[a]) == union_find.find(indices[b])
+        
+        pairs = self._iter_similar_pairs(subset, order, window_end, range(len(order)), connected)
+        for a, b in pairs:
+            union_find.union(indices[a], indices[b])
+    
+    def _iter_similar_pairs(self, tweets: List[Tweet], order: List[int], window_end: List[int],
+                            positions, connected=None):
+        """Yield (a, b) pairs of similar tweets for the given positions in date order."""
+        # Repeated content (retweets, bot copies) reuses the score of an earlier pair; only
+        # pairs with a repeated side can recur, so unique-only pairs are never cached
+        contents = [tweet.content for tweet in tweets]
+        repeated = {content for content, count in Counter(contents).items() if count > 1}
+        similarity_cache = OrderedDict()
+        
+        for p in positions:
+            a = order[p]
+            candidates = order[p + 1:window_end[p]]
+            if not candidates:
+                continue
+            
+            # Index tweet a once and reuse it against every candidate
+            matcher = SequenceMatcher(None, autojunk=False)
+            matcher.set_seq2(contents[a])
+            
+            for b in candidates:
+                if connected is not None and connected(a, b):
                     continue
                 
-                # Check content similarity
-                similarity = self.calculate_content_similarity(
-                    tweets[i].content, tweets[j].content
-                )
+                # Check content similarity, keyed on the order-independent content pair
+                pair = None
+                similarity = None
+                if contents[a] in repeated or contents[b] in repeated:
+                    pair = (min(contents[a], contents[b]), max(contents[a], contents[b]))
+                    similarity = similarity_cache.get(pair)
+                    if similarity is not None:
+                        similarity_cache.move_to_end(pair)
+                        
+                if similarity is None:
+                    if self._passes_shingle_prefilter(tweets[a], tweets[b]):
+                        similarity = self.calculate_content_similarity(
+                            contents[b], contents[a], matcher
+                        )
+                    else:
+                        similarity = 0.0
+                    if pair is not None:
+                        similarity_cache[pair] = similarity
+                        if len(similarity_cache) > SIMILARITY_CACHE_SIZE:
+                            similarity_cache.popitem(last=False)
                 
                 if similarity >= self.content_threshold:
-                    group.append(j)
-                    processed.add(j)
+                    yield a, b
+    
+    def _union_similar_matrix(self, tweets: List[Tweet], indices: List[int],
+                              union_find: "UnionFind"):
+        """Union similar tweets among indices using RapidFuzz similarity matrices."""
+        subset = [tweets[i] for i in indices]
+        contents = [tweet.content for tweet in subset]
+        cutoff = self.content_threshold
+        keys, buckets = self._bucket_by_date(subset)
+        
+        # Parallel arrays let every hit of a block be filtered in one vectorized step
+        keys_arr = np.asarray(keys, dtype=np.int64)
+        times = self._timestamps(subset)
+        has_content = np.array([bool(content) for content in contents], dtype=np.bool_)
+        window = self.date_window.total_seconds()
+        
+        # Score each bucket against itself and its next neighbour
+        for key, rows in buckets.items():
+            cols = rows + buckets.get(key + 1, [])
+            cols_arr = np.asarray(cols, dtype=np.int64)
+            col_contents = [contents[b] for b in cols]
             
-            if len(group) > 1:
-                duplicates.append(group)
-                processed.update(group)
+            for start in range(0, len(rows), CDIST_CHUNK_ROWS):
+                chunk = rows[start:start + CDIST_CHUNK_ROWS]
+                
+                # Score a block of rows in C across all cores
+                sim = process.cdist(
+                    [contents[a] for a in chunk], col_contents, scorer=Indel.normalized_similarity,
+                    score_cutoff=cutoff, dtype=np.float32, workers=-1
+                )
+                
+                hits = np.argwhere(sim >= cutoff)
+                a = np.asarray(chunk, dtype=np.int64)[hits[:, 0]]
+                b = cols_arr[hits[:, 1]]
                 
-        return duplicates
+                # Same-bucket pairs show up twice; keep the a < b copy
+                keep = (a != b) & ~((keys_arr[b] == key) & (b < a))
+                keep &= has_content[a] & has_content[b]
+                keep &= np.abs(times[a] - times[b]) <= window
+                
+                for x, y in zip(a[keep].tolist(), b[keep].tolist()):
+                    # The shingle floor only trims hits here; cdist already scored every pair
+                    if self._passes_shingle_prefilter(subset[x], subset[y]):
+                        union_find.union(indices[x], indices[y])
+    
+    def _union_similar_lsh(self, tweets: List[Tweet], indices: List[int],
+                           union_find: "UnionFind"):
+        """Union similar tweets among indices, scoring only MinHash LSH candidates."""
+        subset = [tweets[i] for i in indices]
+        sigs, valid = self._minhash_signatures(subset)
+        
+        # Tweets sharing any band of their signature become candidate pairs. Band tables
+        # are keyed by date bucket too, so recurring posts only pair within reach of a window.
+        keys, _ = self._bucket_by_date(subset)
+        candidates = set()
+        for band in range(LSH_BANDS):
+            band_sigs = sigs[:, band * LSH_ROWS:(band + 1) * LSH_ROWS]
+            table = defaultdict(list)
+            for a in range(len(subset)):
+                if valid[a]:
+                    table[(keys[a], band_sigs[a].tobytes())].append(a)
+                    
+            for (key, band_key), members in table.items():
+                later = table.get((key + 1, band_key), [])
+                for x in range(len(members)):
+                    for b in members[x + 1:] + later:
+                        a = members[x]
+                        if self.are_dates_close(subset[a].date, subset[b].date):
+                            candidates.add((min(a, b), max(a, b)))
+                        
+        for a, b in sorted(candidates):
+            i, j = indices[a], indices[b]
+            if union_find.find(i) == union_find.find(j):
+                continue
+            if not self._passes_shingle_prefilter(subset[a], subset[b]):
+                continue
+                
+            similarity = self.calculate_content_similarity(subset[a].content, subset[b].content)
+            if similarity >= self.content_threshold:
+                union_find.union(i, j)
+    
+    def _minhash_signatures(self, tweets: List[Tweet]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Build MinHash signatures over character shingles of each tweet."""
+        rng = np.random.RandomState(1)
+        a = rng.randint(1, 1 << 32, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+        b = rng.randint(0, 1 << 32, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+        
+        sigs = np.full((len(tweets), MINHASH_PERMUTATIONS), np.iinfo(np.uint64).max, dtype=np.uint64)
+        valid = np.zeros(len(tweets), dtype=np.bool_)
+        
+        for i, tweet in enumerate(tweets):
+            if not tweet.shingles:
+                continue
+                
+            hashes = np.array([zlib.crc32(sh.encode('utf-8')) for sh in tweet.shingles],
+                              dtype=np.uint64)
+            
+            # 32-bit hashes times 32-bit multipliers stay inside uint64
+            sigs[i] = ((np.outer(hashes, a) + b) % _MERSENNE_PRIME).min(axis=0)
+            valid[i] = True
+            
+        return sigs, valid
+    
+    def _find_duplicates_minhash(self, tweets: List[Tweet]) -> List[List[int]]:
+        """Find duplicate groups by MinHash Jaccard estimate and union-find."""
+        n = len(tweets)
+        if n == 0:
+            return []
+            
+        sigs, valid = self._minhash_signatures(tweets)
+        
+        # Sort by date so each tweet's window is a contiguous run of later rows
+        times = self._timestamps(tweets)
+        order = np.argsort(times, kind='stable')
+        times = times[order]
+        sigs = np.ascontiguousarray(sigs[order])
+        valid = valid[order]
+        window_end = np.searchsorted(
+            times, times + self.date_window.total_seconds(), side='right'
+        ).astype(np.int64)
+        
+        min_agree = int(np.ceil(self.content_threshold * MINHASH_PERMUTATIONS))
+        
+        # Two parallel passes (count, then fill) keep the kernel free of shared writes
+        counts = _minhash_match_counts(sigs, valid, window_end, min_agree)
+        offsets = np.zeros(n, dtype=np.int64)
+        offsets[1:] = np.cumsum(counts)[:-1]
+        pairs = np.empty((int(counts.sum()), 2), dtype=np.int64)
+        _minhash_fill_pairs(sigs, valid, window_end, min_agree, offsets, pairs)
+        
+        roots = _union_find_roots(n, order[pairs].astype(np.int32))
+        
+        groups = defaultdict(list)
+        for i in range(n):
+            groups[int(roots[i])].append(i)
+            
+        return sorted(group for group in groups.values() if len(group) > 1)
     
     def remove_duplicates(self, tweets: List[Tweet]) -> Tuple[List[Tweet], List[List[Tweet]]]:
         """Remove duplicates and return cleaned list with duplicate groups."""
@@ -272,8 +730,14 @@ class DuplicateDetector:
             report['duplicate_details'].append(group_info)
         
         if output_file:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+            if orjson is not None:
+                # orjson writes UTF-8 bytes directly, without ASCII escaping
+                with open(output_file, 'wb') as f:
+                    f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                                         default=str))
+            else:
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    json.dump(report, f, ensure_ascii=False, indent=2, default=str)
         
         return report
     
@@ -305,6 +769,21 @@ class DuplicateDetector:
             print(f"Error saving cleaned tweets: {e}")
 
 
+# Per-process state for the parallel pairwise scorer, set once by the pool initializer
+_pairwise_worker_state = {}
+
+
+def _init_pairwise_worker(detector, tweets, order, window_end):
+    """Store the shared scoring inputs in a pairwise worker process."""
+    _pairwise_worker_state['args'] = (detector, tweets, order, window_end)
+
+
+def _score_pairwise_slice(positions) -> List[Tuple[int, int]]:
+    """Return the similar pairs for a slice of date-ordered positions."""
+    detector, tweets, order, window_end = _pairwise_worker_state['args']
+    return list(detector._iter_similar_pairs(tweets, order, window_end, positions))
+
+
 def main():
     """Main function for standalone duplicate detection."""
     parser = argparse.ArgumentParser(description='Detect and remove duplicate tweets')
@@ -315,6 +794,19 @@ def main():
                        help='Content similarity threshold (0.0-1.0)')
     parser.add_argument('--window', '-w', type=int, default=24,
                        help='Date window in hours for comparison')
+    parser.add_argument('--minhash', action='store_true',
+                       help='Group by MinHash Jaccard of 5-character shingles '
+                            '(threshold applies to the Jaccard estimate)')
+    parser.add_argument('--shingle-threshold', type=float, default=None,
+                       help='Also require this 5-character shingle Jaccard for a match '
+                            '(0.0-1.0); checked before the edit ratio when pairs are scored '
+                            'one at a time, ignored with --minhash')
+    parser.add_argument('--workers', '-j', type=int, default=1,
+                       help='Processes for pairwise scoring when the numpy/cdist path is unavailable '
+                            '(-1 for all cores)')
+    parser.add_argument('--lsh', action='store_true',
+                       help='Only score candidate pairs retrieved by MinHash LSH (large archives); '
+                            'approximate: short tweets with a few edits can miss and go unmatched')
     
     args = parser.parse_args()
     
@@ -324,7 +816,11 @@ def main():
     
     detector = DuplicateDetector(
         content_threshold=args.threshold,
-        date_window_hours=args.window
+        date_window_hours=args.window,
+        use_minhash=args.minhash,
+        use_lsh=args.lsh,
+        shingle_threshold=args.shingle_threshold,
+        workers=args.workers
     )
     
     print(f"Loading tweets from {args.input_file}...")
@@ -11,20 +11,222 @@ except ImportError:
     print("Error: Missing required package 'beautifulsoup4'")
     print("Install it with: pip install beautifulsoup4")
     exit(1)
+from importlib.util import find_spec
+# The C parser is much faster, but the stdlib one keeps the scraper working without lxml
+HTML_PARSER = 'lxml' if find_spec('lxml') else 'html.parser'
 import time
 from datetime import datetime
 import random
 import re
-import hashlib
 import signal
 import sys
 import os
 import json
+import base64
+import html as html_lib
+from multiprocessing import Pool
 from urllib.parse import urlparse
-import pickle
 from pathlib import Path
 
 
+# Patterns used per tweet by the parser and the text writer, compiled once
+_RE_EMOJI = re.compile(r'[^\w\s\u0600-\u06FF]')
+_RE_REPLY = re.compile(r'Replying to|رداً على', re.IGNORECASE)
+_RE_HANDLE_HREF = re.compile(r'^/[^/]+$')
+_RE_MENTION = re.compile(r'@(\w+)')
+_RE_LEADING_MENTIONS = re.compile(r'^(?:@\w+\s*)+')
+
+# Extracts every loaded <article> not seen by an earlier call in one round-trip,
+# mirroring the lookups in extract_tweet_data. Articles with reply or quote context
+# return their outerHTML so BeautifulSoup can handle them. Articles that have
+# rendered their timestamp are tagged data-scraped so later scrolls skip them,
+# which a count offset can't do because the timeline unmounts old articles.
+JS_COLLECT_ARTICLES = r"""
+const strings = (el) => {
+    const out = [];
+    const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+    let node;
+    while ((node = walker.nextNode())) {
+        const text = node.nodeValue.trim();
+        if (text) out.push(text);
+    }
+    return out;
+};
+const replyPattern = /Replying to|رداً على/i;
+return Array.from(document.querySelectorAll('article:not([data-scraped])')).map((article) => {
+    const time = article.querySelector('time');
+    if (time) article.setAttribute('data-scraped', '1');
+    const hasContext = Boolean(
+        article.querySelector('div[data-testid="reply"]') ||
+        article.querySelector('div[role="blockquote"]') ||
+        article.querySelector('div[data-testid="tweetQuote"]') ||
+        replyPattern.test(article.textContent)
+    );
+    if (hasContext) {
+        return {html: article.outerHTML};
+    }
+
+    let name = '', handle = '', cleanName = false;
+    const userDiv = article.querySelector('div[data-testid="User-Name"]');
+    if (userDiv) {
+        const nameSpan = userDiv.querySelector('span[dir="ltr"]');
+        if (nameSpan) {
+            name = strings(nameSpan).join('');
+            cleanName = true;
+        }
+        const handleLink = userDiv.querySelector('a[href^="/"]');
+        if (handleLink && handleLink.getAttribute('href')) {
+            handle = handleLink.getAttribute('href').replace(/^\/+|\/+$/g, '');
+        }
+    }
+    if (!name || !handle) {
+        const authorLink = article.querySelector('a[role="link"][tabindex="-1"]');
+        if (authorLink) {
+            const nameSpan = authorLink.querySelector('span[dir="ltr"]');
+            if (nameSpan) {
+                name = strings(nameSpan).join('');
+                cleanName = false;
+            }
+            if (authorLink.getAttribute('href')) {
+                handle = authorLink.getAttribute('href').replace(/^\/+|\/+$/g, '');
+            }
+        }
+    }
+
+    const textDiv = article.querySelector('div[data-testid="tweetText"]');
+    return {
+        html: null,
+        author_name: name,
+        clean_name: cleanName,
+        author_handle: handle,
+        timestamp: (time && time.getAttribute('datetime')) || '',
+        text: textDiv ? strings(textDiv).join(' ') : ''
+    };
+});
+"""
+
+# Article count, last status link, whether the viewport is at the bottom and the
+# scroll height. The timeline unmounts old articles, so the last link catches changes
+# a count misses.
+JS_SCROLL_STATE = r"""
+const articles = document.querySelectorAll('article');
+const last = articles.length ? articles[articles.length - 1].querySelector('a[href*="/status/"]') : null;
+return [
+    articles.length,
+    last ? last.getAttribute('href') : null,
+    window.innerHeight + window.scrollY >= document.body.offsetHeight - 5,
+    document.body.scrollHeight
+];
+"""
+
+
+# Every status banner the scroll loop reacts to, matched in a single XPath query
+STATUS_MARKERS = (
+    ('end', ("You're caught up", "Nothing to see here")),
+    ('error', ("Something went wrong", "Try again")),
+    ('rate_limit', ("Rate limit", "Too many requests")),
+    ('protected', ("These posts are protected",)),
+)
+STATUS_XPATH = "//span[" + " or ".join(
+    f'contains(., "{phrase}")' for _, phrases in STATUS_MARKERS for phrase in phrases
+) + "]"
+
+# Media the scraper never reads. Scripts and API calls (abs.twimg.com, /i/api) stay unblocked.
+BLOCKED_URL_PATTERNS = [
+    '*.jpg', '*.jpeg', '*.png', '*.webp', '*.gif', '*.mp4', '*.m3u8', '*.woff*', '*.svg',
+    '*pbs.twimg.com/media/*', '*video.twimg.com/*',
+]
+
+
+def _graphql_entries(instructions):
+    """Yield tweet_results.result objects from SearchTimeline instructions."""
+    for instruction in instructions:
+        entries = instruction.get('entries') or ([instruction['entry']] if instruction.get('entry') else [])
+        for entry in entries:
+            if entry.get('entryId', '').startswith('promoted-'):
+                continue
+            content = entry.get('content') or {}
+            # Single tweets carry itemContent, conversation modules carry a list of items
+            items = [content] + [item.get('item') or {} for item in content.get('items') or []]
+            for item in items:
+                result = ((item.get('itemContent') or {}).get('tweet_results') or {}).get('result')
+                if result:
+                    yield result
+
+
+def _graphql_user(result):
+    """Return (name, screen_name) for a tweet result, across old and new payload layouts."""
+    user = ((result.get('core') or {}).get('user_results') or {}).get('result') or {}
+    core, legacy = user.get('core') or {}, user.get('legacy') or {}
+    return core.get('name') or legacy.get('name') or '', core.get('screen_name') or legacy.get('screen_name') or ''
+
+
+def _graphql_result(result):
+    """Unwrap TweetWithVisibilityResults so every result exposes legacy and core directly."""
+    return result.get('tweet') or result
+
+
+def parse_graphql_tweet(result):
+    """Project one SearchTimeline tweet result onto the same dict extract_tweet_data returns."""
+    result = _graphql_result(result)
+    legacy = result.get('legacy')
+    if not legacy or not legacy.get('full_text'):
+        return None
+
+    # Drop the leading reply mentions the page shows in the "Replying to" banner instead.
+    # The display and entity indices count the unescaped text, so unescape before slicing.
+    full_text = html_lib.unescape(legacy['full_text'])
+    start, end = legacy.get('display_text_range') or (0, len(full_text))
+    text = full_text[start:end].strip()
+    if not text:
+        return None
+
+    author_name, author_handle = _graphql_user(result)
+
+    timestamp = ''
+    if legacy.get('created_at'):
+        created = datetime.strptime(legacy['created_at'], "%a %b %d %H:%M:%S %z %Y")
+        timestamp = created.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    reply_to = []
+    reply_text = ''
+    if legacy.get('in_reply_to_screen_name'):
+        for mention in (legacy.get('entities') or {}).get('user_mentions') or []:
+            indices = mention.get('indices') or (start, start)
+            if indices[0] < start:
+                reply_to.append(f"@{mention['screen_name']}")
+        if not reply_to:
+            reply_to.append(f"@{legacy['in_reply_to_screen_name']}")
+
+    # Quoted tweets, same as the blockquote handling in the HTML parser
+    quoted = (result.get('quoted_status_result') or {}).get('result')
+    if quoted:
+        quoted = _graphql_result(quoted)
+        handle = _graphql_user(quoted)[1]
+        if handle and f"@{handle}" not in reply_to:
+            reply_to.append(f"@{handle}")
+        quoted_text = (quoted.get('legacy') or {}).get('full_text')
+        if quoted_text:
+            reply_text = html_lib.unescape(quoted_text)[:280]
+
+    return {
+        'author_name': author_name,
+        'author_handle': author_handle,
+        'timestamp': timestamp,
+        'text': text,
+        'reply_to': reply_to,
+        'reply_text': reply_text
+    }
+
+
+def parse_graphql_timeline(payload):
+    """Return tweet dicts from one SearchTimeline response body."""
+    timeline = (((payload.get('data') or {}).get('search_by_raw_query') or {})
+                .get('search_timeline') or {}).get('timeline') or {}
+    return [tweet for tweet in map(parse_graphql_tweet, _graphql_entries(timeline.get('instructions') or []))
+            if tweet]
+
+
 def validate_url(url):
     """Validate if a string is a proper URL."""
     try:
@@ -34,13 +236,127 @@ def validate_url(url):
         return False
 
 
+def parse_tweet_html(html):
+    """Enhanced tweet extraction with robust reply context handling (module level so pool workers can run it)."""
+    try:
+        soup = BeautifulSoup(html, HTML_PARSER)
+
+        # 1. MAIN CONTENT EXTRACTION - cards, ads and dividers have no text, skip them early
+        text_div = soup.select_one('div[data-testid="tweetText"]')
+        if not text_div:
+            return None
+        text = text_div.get_text(" ", strip=True)
+        if not text:
+            return None
+
+        # 2. AUTHOR EXTRACTION
+        author_name = ''
+        author_handle = ''
+
+        # Primary method: User-Name container
+        user_div = soup.select_one('div[data-testid="User-Name"]')
+        if user_div:
+            # Name extraction
+            name_span = user_div.select_one('span[dir="ltr"]')
+            if name_span:
+                author_name = name_span.get_text(strip=True)
+                # Clean emoji artifacts
+                author_name = _RE_EMOJI.sub('', author_name).strip()
+
+            # Handle extraction
+            handle_link = user_div.select_one('a[href^="/"]')
+            if handle_link and handle_link.get('href'):
+                author_handle = handle_link['href'].strip('/')
+
+        # Fallback method
+        if not author_name or not author_handle:
+            author_link = soup.select_one('a[role="link"][tabindex="-1"]')
+            if author_link:
+                name_span = author_link.select_one('span[dir="ltr"]')
+                if name_span:
+                    author_name = name_span.get_text(strip=True)
+                if author_link.get('href'):
+                    author_handle = author_link['href'].strip('/')
+
+        # 3. TIMESTAMP
+        timestamp = ''
+        time_tag = soup.find('time')
+        if time_tag and time_tag.get('datetime'):
+            timestamp = time_tag['datetime']
+
+        # 4. REPLY CONTEXT HANDLING (FIXES URL ISSUE)
+        reply_to = []
+        reply_text = ""
+
+        # Find the reply context container
+        reply_context = None
+
+        # Look for new X.com reply structure
+        if not reply_context:
+            reply_context = soup.select_one('div[data-testid="reply"]')
+
+        # Look for "Replying to" text element (English and Arabic)
+        if not reply_context:
+            reply_text_element = soup.find(string=_RE_REPLY)
+            if reply_text_element:
+                reply_context = reply_text_element.find_parent()
+
+        # Process reply context if found
+        if reply_context:
+            # Extract mentioned users
+            user_links = reply_context.find_all('a', href=_RE_HANDLE_HREF)
+            reply_to = [f"@{link['href'].strip('/')}" for link in user_links if link.get('href')]
+
+            # Extract the actual reply text snippet: the first sibling with any text
+            next_element = reply_context.find_next_sibling(lambda tag: tag.get_text(strip=True))
+            if next_element:
+                reply_text = next_element.get_text(" ", strip=True)
+
+        # 5. HANDLE QUOTED TWEETS SEPARATELY
+        quoted_block = soup.select_one('div[role="blockquote"]') or soup.select_one('div[data-testid="tweetQuote"]')
+        if quoted_block:
+            # Extract quoted author
+            quoted_author = quoted_block.select_one('a[href^="/"]')
+            if quoted_author and quoted_author.get('href'):
+                handle = quoted_author['href'].strip('/')
+                if handle and handle not in reply_to:
+                    reply_to.append(f"@{handle}")
+
+            # Extract quoted text
+            quoted_text_div = quoted_block.select_one('div[data-testid="tweetText"]')
+            if quoted_text_div:
+                reply_text = quoted_text_div.get_text(" ", strip=True)[:280]
+
+        return {
+            'author_name': author_name,
+            'author_handle': author_handle,
+            'timestamp': timestamp,
+            'text': text,
+            'reply_to': reply_to,
+            'reply_text': reply_text
+        }
+
+    except Exception as e:
+        print(f"Error parsing tweet: {e}")
+        return None
+
+
 class TwitterScraper:
     """Enhanced Twitter scraper with undetected-chromedriver and cookie-based login."""
 
     def __init__(self):
         self.driver = None
         self.wait = None
-        self.cookies_file = "twitter_cookies.pkl"
+        self.cookies_file = "twitter_cookies.json"
+        # Rate-limit backoff: base delay in seconds, doubled per consecutive strike
+        self._backoff = 15.0
+        # Consecutive strikes per banner kind, so page errors don't inherit rate-limit delays
+        self._strikes = {'error': 0, 'rate_limit': 0}
+        # Worker processes for BeautifulSoup parsing, started on the first batch that needs them
+        self._pool = None
+        # SearchTimeline capture: None until the first collection decides JSON or DOM
+        self._graphql_mode = None
+        self._graphql_pending = set()
 
     def setup_driver(self):
         """Configure Chrome WebDriver with anti-detection measures."""
@@ -64,6 +380,9 @@ class TwitterScraper:
             'AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.7204.157 Safari/537.36'
         )
 
+        # Performance log exposes network events, used to capture the SearchTimeline JSON
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
         # Create driver with automatic version handling via webdriver-manager
         try:
             service = Service(ChromeDriverManager().install())
@@ -77,13 +396,62 @@ class TwitterScraper:
             self.driver = webdriver.Chrome(service=service, options=options)
 
         self.wait = WebDriverWait(self.driver, 20)
+        self.block_media()
+
+    def driver_alive(self):
+        """Return True if the browser from an earlier run is still usable."""
+        if not self.driver:
+            return False
+        try:
+            # A script round-trip fails once the window is closed, even if chromedriver still answers
+            return self.driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def ensure_session(self):
+        """Start the browser and log in, unless a previous run left a live session."""
+        if self.driver_alive():
+            return
+        if self.driver:
+            # The browser was closed between runs; release the stale session before relaunching
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+        self.setup_driver()
+
+        # Login with cookie support
+        self.wait_for_manual_login()
+
+    def close(self):
+        """Ask whether to quit the browser once scraping is finished."""
+        if self.driver:
+            response = input("Press 'q' to quit browser, or any other key to keep it open: ").strip().lower()
+            if response == 'q':
+                self.driver.quit()
+                self.driver = None
+                print("Browser closed.")
+
+    def block_media(self):
+        """Stop Chrome from downloading images, video and fonts via CDP."""
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+            print("✓ Blocking image, video and font requests")
+        except Exception as e:
+            print(f"⚠ Could not block media requests: {e}")
 
     def save_cookies(self):
         """Save cookies and session data for persistent login."""
         try:
-            cookies = self.driver.get_cookies()
-            with open(self.cookies_file, 'wb') as f:
-                pickle.dump(cookies, f)
+            # Keep only JSON-native values so the file loads back without pickle
+            cookies = [
+                {k: v for k, v in cookie.items() if isinstance(v, (str, int, float, bool, type(None)))}
+                for cookie in self.driver.get_cookies()
+            ]
+            with open(self.cookies_file, 'w', encoding='utf-8') as f:
+                json.dump(cookies, f)
             print("✓ Cookies saved successfully")
         except Exception as e:
             print(f"⚠ Error saving cookies: {e}")
@@ -92,19 +460,23 @@ class TwitterScraper:
         """Load saved cookies for automatic login."""
         try:
             if os.path.exists(self.cookies_file):
-                with open(self.cookies_file, 'rb') as f:
-                    cookies = pickle.load(f)
+                with open(self.cookies_file, 'r', encoding='utf-8') as f:
+                    cookies = json.load(f)
 
-                self.driver.get("https://x.com")
-                time.sleep(2)
+                if self._set_cookies_cdp(cookies):
+                    # CDP cookies don't need the domain open first, so load it once
+                    self.driver.get("https://x.com")
+                else:
+                    self.driver.get("https://x.com")
+                    time.sleep(2)
 
-                for cookie in cookies:
-                    try:
-                        self.driver.add_cookie(cookie)
-                    except Exception as e:
-                        continue
+                    for cookie in cookies:
+                        try:
+                            self.driver.add_cookie(cookie)
+                        except Exception as e:
+                            continue
 
-                self.driver.refresh()
+                    self.driver.refresh()
                 time.sleep(3)
 
                 # Check if logged in
@@ -122,6 +494,25 @@ class TwitterScraper:
             print(f"⚠ Error loading cookies: {e}")
             return False
 
+    def _set_cookies_cdp(self, cookies):
+        """Set all cookies in one Network.setCookies call; returns False so the caller can fall back."""
+        cdp_cookies = []
+        for cookie in cookies:
+            cdp_cookie = {k: v for k, v in cookie.items() if k != 'expiry'}
+            if 'expiry' in cookie:
+                cdp_cookie['expires'] = cookie['expiry']
+            if 'sameSite' in cdp_cookie:
+                cdp_cookie['sameSite'] = str(cdp_cookie['sameSite']).capitalize()
+            if not cdp_cookie.get('domain'):
+                cdp_cookie['url'] = "https://x.com"
+            cdp_cookies.append(cdp_cookie)
+        try:
+            self.driver.execute_cdp_cmd('Network.setCookies', {'cookies': cdp_cookies})
+            return True
+        except Exception as e:
+            print(f"⚠ Batch cookie load failed, adding one by one: {str(e)[:200]}")
+            return False
+
     def wait_for_manual_login(self):
         """Wait for user to manually log in with enhanced error handling."""
         print("\n" + "=" * 60)
@@ -137,50 +528,80 @@ class TwitterScraper:
         # Manual login
         print("Manual login required - browser will open X.com login page")
 
-        max_attempts = 5000
+        login_url = "https://x.com/i/flow/login"
+        self.driver.get(login_url)
+
+        max_attempts = 3
         for attempt in range(max_attempts):
             try:
-                self.driver.get("https://x.com/i/flow/login")
                 input("Press Enter AFTER you've successfully logged in...")
 
                 # Verify login
-                try:
-                    self.wait.until(EC.presence_of_element_located(
-                        (By.CSS_SELECTOR, '[data-testid="AppTabBar_Home_Link"]')
-                    ))
+                if self._is_logged_in():
                     print("✓ Login verified successfully")
                     self.save_cookies()
                     return
-                except TimeoutException:
-                    if attempt < max_attempts - 1:
-                        print(f"⚠ Login verification failed, retrying... ({attempt + 1}/{max_attempts})")
-                    else:
-                        print("⚠ Could not verify login - continuing anyway")
+
+                if attempt < max_attempts - 1:
+                    print(f"⚠ Login verification failed, retrying... ({attempt + 1}/{max_attempts})")
+                    # Only reload if the browser left the login flow, so a half-filled form survives
+                    if "/i/flow/login" not in self.driver.current_url:
+                        self.driver.get(login_url)
+                else:
+                    print("⚠ Could not verify login - continuing anyway")
 
             except Exception as e:
                 print(f"⚠ Login error: {e}")
                 if attempt < max_attempts - 1:
                     time.sleep(5)
 
-    def handle_errors(self):
+    def _is_logged_in(self, timeout=5):
+        """Return True once the home tab is on the page, waiting at most timeout seconds."""
+        try:
+            WebDriverWait(self.driver, timeout).until(EC.presence_of_element_located(
+                (By.CSS_SELECTOR, '[data-testid="AppTabBar_Home_Link"]')
+            ))
+            return True
+        except TimeoutException:
+            return False
+
+    def page_status(self):
+        """Return which status banners (end, error, rate_limit, protected) are on the page, in one lookup."""
+        status = set()
+        for hit in self.driver.find_elements(By.XPATH, STATUS_XPATH):
+            text = hit.text
+            for kind, phrases in STATUS_MARKERS:
+                if any(phrase in text for phrase in phrases):
+                    status.add(kind)
+        return status
+
+    def _backoff_delay(self, kind, base):
+        """Return the next exponential backoff delay for kind with jitter and count the strike."""
+        delay = min(600, base * 2 ** self._strikes[kind])
+        self._strikes[kind] += 1
+        return delay + random.uniform(0, 0.1 * delay)
+
+    def handle_errors(self, status=None):
         """Handle common Twitter errors with recovery mechanisms."""
         try:
-            # Check for "Something went wrong"
-            error_elements = self.driver.find_elements(By.XPATH,
-                "//span[contains(., 'Something went wrong') or contains(., 'Try again')]")
+            if status is None:
+                status = self.page_status()
 
-            if error_elements:
+            # A check without the banner ends that kind's run of strikes
+            for kind in self._strikes:
+                if kind not in status:
+                    self._strikes[kind] = 0
+
+            # Check for "Something went wrong"
+            if 'error' in status:
                 print("⚠ Detected error message - attempting recovery...")
 
                 # Try refresh
                 self.driver.refresh()
-                time.sleep(random.uniform(5, 8))
+                time.sleep(self._backoff_delay('error', 5))
 
                 # Check if error persists
-                error_elements = self.driver.find_elements(By.XPATH,
-                    "//span[contains(., 'Something went wrong')]")
-
-                if error_elements:
+                if 'error' in self.page_status():
                     # Try navigating back to home
                     self.driver.get("https://x.com/home")
                     time.sleep(random.uniform(3, 5))
@@ -189,12 +610,10 @@ class TwitterScraper:
                 return True
 
             # Check for rate limiting
-            rate_limit = self.driver.find_elements(By.XPATH,
-                "//span[contains(., 'Rate limit') or contains(., 'Too many requests')]")
-
-            if rate_limit:
-                print("⚠ Rate limit detected - waiting...")
-                time.sleep(random.uniform(30, 60))
+            if 'rate_limit' in status:
+                delay = self._backoff_delay('rate_limit', self._backoff)
+                print(f"⚠ Rate limit detected - waiting {delay:.0f}s...")
+                time.sleep(delay)
                 return False
 
             return True
@@ -203,36 +622,40 @@ class TwitterScraper:
             print(f"⚠ Error handling failed: {e}")
             return False
 
-    def collect_loaded_tweets(self, seen_keys, start_date, username, end_date):
-        """Collect tweets currently loaded on page with enhanced error handling."""
-        collected = []
+    def collect_loaded_tweets(self, seen_keys, start_date, username, end_date, out):
+        """Append new on-page tweets to the checkpoint; returns (new count, oldest tweet date seen)."""
+        collected = 0
+        oldest = None
         try:
-            tweet_elements = self.driver.find_elements(By.XPATH, "//article")
-            print(f"Found {len(tweet_elements)} tweet elements on page")
+            tweets = self._page_tweets()
+            print(f"Found {len(tweets)} new tweet elements on page")
 
-            for el in tweet_elements:
+            for tweet in tweets:
                 try:
-                    html = el.get_attribute('outerHTML')
-                    tweet = self.extract_tweet_data(html)
                     if not tweet:
                         continue
 
+                    tweet_date = None
+                    try:
+                        if tweet['timestamp']:
+                            tweet_date = datetime.strptime(tweet['timestamp'][:10], "%Y-%m-%d")
+                            if oldest is None or tweet_date < oldest:
+                                oldest = tweet_date
+                    except:
+                        pass
+
                     # Validation and deduplication
-                    content_hash = hashlib.sha256(tweet['text'].strip().encode()).hexdigest()
-                    timestamp_key = tweet['timestamp'][:10] if tweet['timestamp'] else 'unknown'
-                    key = f"{timestamp_key}_{content_hash}"
+                    key = self._tweet_key(tweet)
 
                     if key not in seen_keys:
-                        try:
-                            if tweet['timestamp']:
-                                tweet_date = datetime.strptime(tweet['timestamp'][:10], "%Y-%m-%d")
-                                if tweet_date < start_date:
-                                    continue
-                        except:
-                            pass
+                        if tweet_date and tweet_date < start_date:
+                            continue
 
                         seen_keys.add(key)
-                        collected.append(tweet)
+                        # Recorded so a resumed run reads from the same source the keys came from
+                        tweet['source'] = 'graphql' if self._graphql_mode else 'dom'
+                        out.write(json.dumps(tweet, ensure_ascii=False) + "\n")
+                        collected += 1
 
                 except Exception as e:
                     print(f"Error processing tweet element: {str(e)[:200]} - skipping")
@@ -241,13 +664,153 @@ class TwitterScraper:
         except Exception as e:
             print(f"Error collecting tweets: {e}")
 
-        print(f"Successfully processed {len(collected)} tweets")
-        return collected
+        if collected:
+            # One flush per batch keeps a crash from losing more than the current page
+            out.flush()
+
+        print(f"Successfully processed {collected} tweets")
+        return collected, oldest
+
+    @staticmethod
+    def _tweet_key(tweet):
+        """Deduplication key: tweet date plus a hash of the text."""
+        # In-memory only, so the built-in hash and a plain tuple are enough
+        timestamp_key = tweet['timestamp'][:10] if tweet['timestamp'] else 'unknown'
+        return (timestamp_key, hash(tweet['text'].strip()))
 
-    def smart_scroll_and_collect(self, username, start_date, end_date, max_scrolls=10000, slow_mode=False):
-        """Enhanced scrolling with error recovery and anti-detection."""
-        seen_keys = set()
-        all_tweets = []
+    @staticmethod
+    def read_checkpoint(path):
+        """Yield tweets from a JSONL checkpoint file, skipping a torn last line."""
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    @staticmethod
+    def repair_checkpoint(path):
+        """Cut a torn last line left by a crash, so appended records start on a fresh line."""
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            end = size
+            # Walk back in blocks to the last newline; everything after it is a partial record
+            while end > 0:
+                start = max(0, end - 4096)
+                f.seek(start)
+                block = f.read(end - start)
+                newline = block.rfind(b'\n')
+                if newline != -1:
+                    end = start + newline + 1
+                    break
+                end = start
+            if end != size:
+                f.truncate(end)
+                print(f"⚠ Dropped a partial record at the end of {path}")
+
+    def _page_tweets(self):
+        """New tweets from captured SearchTimeline JSON when the page serves it, else from the DOM."""
+        if self._graphql_mode is not False:
+            found, tweets = self._graphql_collect()
+            if self._graphql_mode is None:
+                # Decided once per checkpoint, since the two sources format text slightly differently
+                self._graphql_mode = found or bool(self._graphql_pending)
+                print("✓ Reading tweets from SearchTimeline responses" if self._graphql_mode
+                      else "⚠ No SearchTimeline responses captured - reading tweets from the page")
+            if self._graphql_mode:
+                return tweets
+        return self._tweets_from_js(self._js_collect())
+
+    def _graphql_collect(self):
+        """Drain the performance log; returns (saw a SearchTimeline response, parsed tweets)."""
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception:
+            return False, []
+
+        # Bodies are only available once loading finishes, which may be a later drain
+        finished = set()
+        for entry in entries:
+            message = json.loads(entry['message'])['message']
+            params = message.get('params') or {}
+            if message.get('method') == 'Network.responseReceived':
+                if '/SearchTimeline' in params.get('response', {}).get('url', ''):
+                    self._graphql_pending.add(params['requestId'])
+            elif message.get('method') == 'Network.loadingFinished':
+                finished.add(params.get('requestId'))
+
+        found = False
+        tweets = []
+        for request_id in self._graphql_pending & finished:
+            self._graphql_pending.discard(request_id)
+            try:
+                response = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+                body = response['body']
+                if response.get('base64Encoded'):
+                    body = base64.b64decode(body).decode('utf-8')
+                tweets.extend(parse_graphql_timeline(json.loads(body)))
+                found = True
+            except Exception as e:
+                print(f"⚠ Could not read SearchTimeline response: {str(e)[:200]}")
+        return found, tweets
+
+    def _js_collect(self):
+        """Extract every loaded article in a single execute_script round-trip."""
+        return self.driver.execute_script(JS_COLLECT_ARTICLES) or []
+
+    def _tweets_from_js(self, articles):
+        """Build tweet dicts for a JS batch, parsing the HTML fallbacks in the worker pool."""
+        html_list = [item['html'] for item in articles if item.get('html')]
+        if len(html_list) > 1:
+            if not self._pool:
+                # Parsing is CPU-bound and independent per article, so it scales across processes
+                self._pool = Pool(processes=max(1, (os.cpu_count() or 2) // 2))
+            parsed = iter(self._pool.map(parse_tweet_html, html_list))
+        else:
+            parsed = iter([parse_tweet_html(html) for html in html_list])
+        # Keep page order so the checkpoint stays newest-first
+        return [next(parsed) if item.get('html') else self._tweet_from_js(item) for item in articles]
+
+    def _tweet_from_js(self, item):
+        """Build a tweet dict from one JS-extracted article without HTML."""
+        text = item.get('text') or ''
+        if not text:
+            return None
+
+        author_name = item.get('author_name') or ''
+        if item.get('clean_name'):
+            # Clean emoji artifacts
+            author_name = _RE_EMOJI.sub('', author_name).strip()
+
+        return {
+            'author_name': author_name,
+            'author_handle': item.get('author_handle') or '',
+            'timestamp': item.get('timestamp') or '',
+            'text': text,
+            'reply_to': [],
+            'reply_text': ''
+        }
+
+    @staticmethod
+    def _timeline_advanced(driver, before):
+        """Wait predicate: the article list changed or the viewport reached the bottom."""
+        count, last_href, at_bottom, _ = driver.execute_script(JS_SCROLL_STATE)
+        return (count, last_href) != (before[0], before[1]) or at_bottom
+
+    @staticmethod
+    def _height_changed(driver, height):
+        """Wait predicate: the new scroll height once it differs from height."""
+        new_height = driver.execute_script("return document.body.scrollHeight")
+        return new_height if new_height != height else False
+
+    def smart_scroll_and_collect(self, username, start_date, end_date, out, seen_keys,
+                                 max_scrolls=10000, slow_mode=False):
+        """Enhanced scrolling with error recovery and anti-detection; returns the number of new tweets."""
+        total_new = 0
         no_new_count = 0
         scroll_num = 0
 
@@ -256,44 +819,54 @@ class TwitterScraper:
         base_delay = (4.0, 6.0) if slow_mode else (2.0, 3.0)
 
         # Collect initial tweets
-        initial_tweets = self.collect_loaded_tweets(seen_keys, start_date, username, end_date)
-        if initial_tweets:
-            all_tweets.extend(initial_tweets)
+        new_tweets, oldest = self.collect_loaded_tweets(seen_keys, start_date, username, end_date, out)
+        total_new += new_tweets
+        if oldest and oldest < start_date:
+            print("✓ Scrolled past the start date")
+            return total_new
 
         while scroll_num < max_scrolls:
             try:
-                # Check for errors before scrolling
-                if not self.handle_errors():
-                    continue
-
-                # Human-like scrolling
-                for _ in range(3):
-                    self.driver.execute_script(f"window.scrollBy(0, {scroll_step})")
-                    time.sleep(random.uniform(base_delay[0]/2, base_delay[1]/2))
-
-                # Wait for content to load
-                time.sleep(random.uniform(*base_delay))
+                # Scroll, then wait only until new tweets render or the page bottoms out
+                before = self.driver.execute_script(JS_SCROLL_STATE)
+                self.driver.execute_script(f"window.scrollBy(0, {scroll_step * 3})")
+                try:
+                    WebDriverWait(self.driver, 8).until(
+                        lambda d: self._timeline_advanced(d, before)
+                    )
+                except TimeoutException:
+                    pass
 
-                # Check if reached bottom
-                current_height = self.driver.execute_script("return document.body.scrollHeight")
-                time.sleep(1)
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
+                # Politeness floor between scrolls, not a load timeout
+                time.sleep(random.uniform(base_delay[0] / 2, base_delay[1] / 2))
 
-                if current_height == new_height:
+                # Check if reached bottom against the height from before this scroll, so a
+                # page that already grew during the waits above passes on the first poll
+                try:
+                    WebDriverWait(self.driver, 1, poll_frequency=0.25).until(
+                        lambda d: self._height_changed(d, before[3])
+                    )
+                except TimeoutException:
                     # Double wait for dynamic content
                     time.sleep(random.uniform(base_delay[1], base_delay[1]*2))
 
-                # Check for end markers
-                end_markers = self.driver.find_elements(By.XPATH,
-                    "//span[contains(., \"You're caught up\") or contains(., \"Nothing to see here\")]")
-                if end_markers:
+                # One lookup covers end markers, error banners and rate limiting
+                status = self.page_status()
+                if 'end' in status:
                     print("✓ Reached end of results")
                     break
 
+                if not self.handle_errors(status):
+                    continue
+
                 # Collect new tweets
-                new_tweets = self.collect_loaded_tweets(seen_keys, start_date, username, end_date)
-                if new_tweets:
-                    all_tweets.extend(new_tweets)
+                new_tweets, oldest = self.collect_loaded_tweets(seen_keys, start_date, username, end_date, out)
+                total_new += new_tweets
+
+                # Live search is newest-first, so nothing further down is inside the range
+                if oldest and oldest < start_date:
+                    print("✓ Scrolled past the start date")
+                    break
 
                 if not new_tweets:
                     no_new_count += 1
@@ -311,182 +884,92 @@ class TwitterScraper:
                 time.sleep(base_delay[1] * 2)
                 continue
 
-        return all_tweets
+        return total_new
 
     def extract_tweet_data(self, html):
         """Enhanced tweet extraction with robust reply context handling."""
-        try:
-            soup = BeautifulSoup(html, 'html.parser')
-
-            # 1. AUTHOR EXTRACTION
-            author_name = ''
-            author_handle = ''
-
-            # Primary method: User-Name container
-            user_div = soup.select_one('div[data-testid="User-Name"]')
-            if user_div:
-                # Name extraction
-                name_span = user_div.select_one('span[dir="ltr"]')
-                if name_span:
-                    author_name = name_span.get_text(strip=True)
-                    # Clean emoji artifacts
-                    author_name = re.sub(r'[^\w\s\u0600-\u06FF]', '', author_name).strip()
-
-                # Handle extraction
-                handle_link = user_div.select_one('a[href^="/"]')
-                if handle_link and handle_link.get('href'):
-                    author_handle = handle_link['href'].strip('/')
-
-            # Fallback method
-            if not author_name or not author_handle:
-                author_link = soup.select_one('a[role="link"][tabindex="-1"]')
-                if author_link:
-                    name_span = author_link.select_one('span[dir="ltr"]')
-                    if name_span:
-                        author_name = name_span.get_text(strip=True)
-                    if author_link.get('href'):
-                        author_handle = author_link['href'].strip('/')
-
-            # 2. TIMESTAMP
-            timestamp = ''
-            time_tag = soup.find('time')
-            if time_tag and time_tag.get('datetime'):
-                timestamp = time_tag['datetime']
-
-            # 3. MAIN CONTENT EXTRACTION
-            text = ''
-            text_div = soup.select_one('div[data-testid="tweetText"]')
-            if text_div:
-                text = text_div.get_text(" ", strip=True)
-
-            # 4. REPLY CONTEXT HANDLING (FIXES URL ISSUE)
-            reply_to = []
-            reply_text = ""
-
-            # Find the reply context container
-            reply_context = None
-
-            # Look for new X.com reply structure
-            if not reply_context:
-                reply_context = soup.select_one('div[data-testid="reply"]')
-
-            # Look for "Replying to" text element (English and Arabic)
-            if not reply_context:
-                reply_text_element = soup.find(string=re.compile(r'Replying to|رداً على', re.IGNORECASE))
-                if reply_text_element:
-                    reply_context = reply_text_element.find_parent()
-
-            # Process reply context if found
-            if reply_context:
-                # Extract mentioned users
-                user_links = reply_context.find_all('a', href=re.compile(r'^/[^/]+$'))
-                reply_to = [f"@{link['href'].strip('/')}" for link in user_links if link.get('href')]
-
-                # Extract the actual reply text snippet
-                next_element = reply_context.find_next_sibling()
-                while next_element:
-                    if next_element.get_text(strip=True):
-                        reply_text = next_element.get_text(" ", strip=True)
-                        break
-                    next_element = next_element.find_next_sibling()
-
-            # 5. HANDLE QUOTED TWEETS SEPARATELY
-            quoted_block = soup.select_one('div[role="blockquote"]') or soup.select_one('div[data-testid="tweetQuote"]')
-            if quoted_block:
-                # Extract quoted author
-                quoted_author = quoted_block.select_one('a[href^="/"]')
-                if quoted_author and quoted_author.get('href'):
-                    handle = quoted_author['href'].strip('/')
-                    if handle and handle not in reply_to:
-                        reply_to.append(f"@{handle}")
-
-                # Extract quoted text
-                quoted_text_div = quoted_block.select_one('div[data-testid="tweetText"]')
-                if quoted_text_div:
-                    reply_text = quoted_text_div.get_text(" ", strip=True)[:280]
-
-            return {
-                'author_name': author_name,
-                'author_handle': author_handle,
-                'timestamp': timestamp,
-                'text': text,
-                'reply_to': reply_to,
-                'reply_text': reply_text
-            } if text else None
-
-        except Exception as e:
-            print(f"Error parsing tweet: {e}")
-            return None
-
-    def save_tweets(self, tweets, username, start_date, end_date):
-        """Save collected tweets with enhanced formatting including reply context."""
-        if not tweets:
+        return parse_tweet_html(html)
+
+    @staticmethod
+    def output_stem(username, start_date, end_date):
+        """Base file name shared by the JSONL checkpoint and the text report."""
+        return f"tweets_{username}_{start_date.strftime('%Y%m%d')}_to_{end_date.strftime('%Y%m%d')}"
+
+    def save_tweets(self, tweets, username, start_date, end_date, total=None):
+        """Save collected tweets with reply context; tweets may be an iterator when total is given."""
+        if total is None:
+            total = len(tweets)
+        if not total:
             return 0
 
-        filename = f"tweets_{username}_{start_date.strftime('%Y%m%d')}_to_{end_date.strftime('%Y%m%d')}.txt"
+        filename = f"{self.output_stem(username, start_date, end_date)}.txt"
 
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(f"ENHANCED TWEETS WITH REPLY CONTEXT\n")
-                f.write(f"Username: @{username}\n")
-                f.write(f"Date Range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}\n")
-                f.write(f"Total Tweets: {len(tweets)}\n")
-                f.write("=" * 80 + "\n\n")
+            # Large buffer plus one write per tweet block instead of one per line
+            with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                separator = "=" * 80
+                f.write(
+                    f"ENHANCED TWEETS WITH REPLY CONTEXT\n"
+                    f"Username: @{username}\n"
+                    f"Date Range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}\n"
+                    f"Total Tweets: {total}\n"
+                    f"{separator}\n\n"
+                )
 
                 for i, tweet in enumerate(tweets, 1):
                     # Tweet header
-                    f.write(f"TWEET {i}\n")
+                    parts = [f"TWEET {i}\n"]
 
                     # Author and username
                     author_name = tweet.get('author_name', 'Unknown author')
                     author_handle = tweet.get('author_handle', username)
-                    f.write(f"Author: {author_name} (@{author_handle})\n")
+                    parts.append(f"Author: {author_name} (@{author_handle})\n")
 
                     # Date
                     timestamp = tweet.get('timestamp', '')
                     if timestamp:
                         date_str = timestamp.split('T')[0]
-                        f.write(f"Date: {date_str}\n")
+                        parts.append(f"Date: {date_str}\n")
                     else:
-                        f.write("Date: Unknown\n")
+                        parts.append("Date: Unknown\n")
 
                     # Reply context (username and text)
                     reply_to = tweet.get('reply_to', '')
                     if reply_to:
                         # Extract username from reply_to
-                        usernames = re.findall(r'@(\w+)', str(reply_to))
+                        usernames = _RE_MENTION.findall(str(reply_to))
                         if usernames:
-                            f.write(f"Replying to: @{', @'.join(usernames)}\n")
+                            parts.append(f"Replying to: @{', @'.join(usernames)}\n")
 
                     # Reply text (the tweet inside the main tweet)
                     reply_text = tweet.get('reply_text', '')
                     if reply_text:
-                        f.write(f"Reply Text: {reply_text}\n")
+                        parts.append(f"Reply Text: {reply_text}\n")
 
                     # Main tweet text
-                    f.write("Main Tweet:\n")
+                    parts.append("Main Tweet:\n")
                     main_text = tweet.get('text', '')
 
                     # Clean up the text to remove reply mentions at the beginning
                     if reply_to and main_text:
                         # Remove @username patterns from the beginning
-                        cleaned_text = re.sub(r'^(@\w+\s*)+', '', main_text).strip()
-                        f.write(f"{cleaned_text}\n")
+                        cleaned_text = _RE_LEADING_MENTIONS.sub('', main_text).strip()
+                        parts.append(f"{cleaned_text}\n")
                     else:
-                        f.write(f"{main_text}\n")
+                        parts.append(f"{main_text}\n")
 
                     # URLs if any
                     urls = tweet.get('urls', [])
                     if urls:
-                        f.write("\nURLs:\n")
-                        for url in urls:
-                            f.write(f"- {url}\n")
+                        parts.append("\nURLs:\n")
+                        parts.extend(f"- {url}\n" for url in urls)
 
                     # Separator
-                    f.write("\n" + "=" * 80 + "\n\n")
+                    parts.append(f"\n{separator}\n\n")
+                    f.write("".join(parts))
 
-            print(f"✓ Saved {len(tweets)} tweets to {filename}")
-            return len(tweets)
+            print(f"✓ Saved {total} tweets to {filename}")
+            return total
 
         except Exception as e:
             print(f"Error saving tweets: {e}")
@@ -497,10 +980,8 @@ class TwitterScraper:
         total_collected = 0
 
         try:
-            self.setup_driver()
-
-            # Login with cookie support
-            self.wait_for_manual_login()
+            # Reuses the browser across restarts instead of relaunching Chrome each time
+            self.ensure_session()
 
             # Navigate to search
             start_str = start_date.strftime("%Y-%m-%d")
@@ -511,28 +992,52 @@ class TwitterScraper:
                 "&src=typed_query&f=live"
             )
 
+            # Start each run with an empty network log; a new checkpoint decides JSON or DOM afresh
+            self._graphql_mode = None
+            self._graphql_pending.clear()
+            try:
+                self.driver.get_log('performance')
+            except Exception:
+                pass
+
             self.driver.get(search_url)
 
             # Wait for tweets to load
             try:
-                self.wait.until(EC.presence_of_element_located((By.XPATH, "//article")))
+                self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "article")))
                 time.sleep(3)
             except TimeoutException:
                 print("⚠ Timed out waiting for tweets to load")
 
             # Check if account is protected
-            protected = self.driver.find_elements(By.XPATH,
-                "//span[contains(., 'These posts are protected')]")
-            if protected:
+            if 'protected' in self.page_status():
                 print("✗ Account is protected. Cannot scrape tweets.")
                 return 0
 
-            # Collect tweets
-            tweets = self.smart_scroll_and_collect(username, start_date, end_date, max_scrolls, slow_mode)
-
-            # Save tweets
-            if tweets:
-                total_collected = self.save_tweets(tweets, username, start_date, end_date)
+            # Resume from the checkpoint of an earlier run over the same range
+            checkpoint = f"{self.output_stem(username, start_date, end_date)}.jsonl"
+            self.repair_checkpoint(checkpoint)
+            seen_keys = set()
+            source = None
+            for tweet in self.read_checkpoint(checkpoint):
+                seen_keys.add(self._tweet_key(tweet))
+                # Checkpoints from before sources were recorded all came from the page
+                source = tweet.get('source', 'dom')
+            if seen_keys:
+                print(f"✓ Resuming with {len(seen_keys)} tweets from {checkpoint}")
+                # Dedup keys hash the text, so keep the source the checkpoint was written from
+                self._graphql_mode = source == 'graphql'
+
+            # Collect tweets, streaming each one to the checkpoint as it arrives
+            with open(checkpoint, 'a', encoding='utf-8') as out:
+                self.smart_scroll_and_collect(username, start_date, end_date, out, seen_keys,
+                                              max_scrolls, slow_mode)
+
+            # Save tweets, streaming the checkpoint twice: once to count, once to write
+            total = sum(1 for _ in self.read_checkpoint(checkpoint))
+            if total:
+                total_collected = self.save_tweets(self.read_checkpoint(checkpoint),
+                                                   username, start_date, end_date, total)
                 print(f"\n✓ Total tweets collected and saved: {total_collected}")
 
             return total_collected
@@ -541,11 +1046,10 @@ class TwitterScraper:
             print(f"\nError during scraping: {e}")
             return total_collected
         finally:
-            if self.driver:
-                response = input("Press 'q' to quit browser, or any other key to keep it open: ").strip().lower()
-                if response == 'q':
-                    self.driver.quit()
-                    print("Browser closed.")
+            if self._pool:
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
 
 
 def main():
@@ -556,15 +1060,19 @@ def main():
     start_date = datetime(2024,1,1)
     end_date = datetime(2024,9,17)
 
-    while True:
-        start_time = time.time()
-        total_tweets = scraper.scrape_tweets(username, start_date, end_date)
-        elapsed = time.time() - start_time
-        print(f"\nCompleted in {elapsed:.1f} seconds, total tweets: {total_tweets}")
-
-        response = input("\nScraping completed. Press ENTER to exit, or type 'r' to restart: ").strip().lower()
-        if response != 'r':
-            break
+    # The first run starts the browser and logs in; restarts reuse that session
+    try:
+        while True:
+            start_time = time.time()
+            total_tweets = scraper.scrape_tweets(username, start_date, end_date)
+            elapsed = time.time() - start_time
+            print(f"\nCompleted in {elapsed:.1f} seconds, total tweets: {total_tweets}")
+
+            response = input("\nScraping completed. Press ENTER to exit, or type 'r' to restart: ").strip().lower()
+            if response != 'r':
+                break
+    finally:
+        scraper.close()
 
 
 if __name__ == "__main__":